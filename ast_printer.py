@@ -6,8 +6,45 @@ class AstPrinter(Visitor):
     def __init__(self, reverse_polish_notation=False):
         self.reverse_polish_notation = reverse_polish_notation
 
-    def print(self, expr: Expr):
-        return expr.accept(self)
+    def print(self, expr: Expr) -> str:
+        """
+        Expands the tree with an explicit stack instead of recursion and joins the output once at the end,
+        so printing stays linear and cannot exhaust the Python stack however deep the tree is.
+        The result is the same as `expr.accept(self)`.
+        """
+        parts = []
+        stack = [expr]
+
+        while stack:
+            item = stack.pop()
+
+            if isinstance(item, Expr):
+                stack.extend(reversed(self._pieces(item)))
+            else:
+                parts.append(item)
+
+        return "".join(parts)
+
+    def _pieces(self, expr: Expr) -> list:
+        """The text of a single node as `parenthesize` lays it out, with the child expressions left in place."""
+        if isinstance(expr, BinaryExpr):
+            name, children = expr.operator.lexeme, (expr.expr_left, expr.expr_right)
+        elif isinstance(expr, UnaryExpr):
+            name, children = expr.operator.lexeme, (expr.expr_right,)
+        elif isinstance(expr, GroupExpr):
+            name, children = "group", (expr.expr,)
+        else:
+            return [expr.accept(self)]
+
+        pieces = [f"({name}" if not self.reverse_polish_notation else "("]
+
+        for child in children:
+            pieces.append(" ")
+            pieces.append(child)
+
+        pieces.append(f" {name})" if self.reverse_polish_notation else ")")
+
+        return pieces
 
     def visit_binaryexpr(self, expr: BinaryExpr):
         return self.parenthesize(expr.operator.lexeme, expr.expr_left, expr.expr_right)
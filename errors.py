@@ -2,14 +2,23 @@ import sys
 from hill_token import Token, TokenType
 
 had_error = False
+had_runtime_error = False
 
 def error(token: Token, message):
     if token.token_type == TokenType.EOF:
-        report(token.line, " at end", message)
+        report(token.line, " at end", message, column=token.column)
     else:
-        report(token.line, " at '" + token.lexeme + "'", message)
+        report(token.line, " at '" + token.lexeme + "'", message, column=token.column)
 
-def report(line, where, message):
+def location(line, column=None) -> str:
+    return f"line {line}" if column is None else f"line {line}, column {column}"
+
+def report(line, where, message, column=None):
     global had_error
-    print(f"[line {line}] Error{where}: {message}", file=sys.stderr)
+    print(f"[{location(line, column)}] Error{where}: {message}", file=sys.stderr)
     had_error = True
+
+def runtime_error(error):
+    global had_runtime_error
+    print(f"{error.message}\n[{location(error.token.line, error.token.column)}]", file=sys.stderr)
+    had_runtime_error = True
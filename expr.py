@@ -33,6 +33,8 @@ class BinaryExpr(Expr):
         self.expr_left = expr_left
         self.operator = operator
         self.expr_right = expr_right
+        # Type profile used by the interpreter to specialize this node
+        self.inline_cache = None
 
     def accept(self, visitor: Visitor):
         return visitor.visit_binaryexpr(self)
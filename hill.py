@@ -1,50 +1,66 @@
 from sys import argv, exit
-from pathlib import Path
-from scanner import Scanner
-from parser import Parser
-from ast_printer import AstPrinter
+from parse_cache import ParseCache, CompiledSource
+from interpreter import Interpreter
 
 import errors
 
 class Hill:
+    # Shared by every `Hill` so embedders and the REPL reuse earlier compiles.
+    parse_cache = ParseCache()
+    # Shared too, so the inline caches of cached expressions stay warm between runs.
+    interpreter = Interpreter()
+
     def main(self):
         args = argv[1:]
-        print(args)
+        # `--ast` prints the parsed expression in reverse polish notation instead of evaluating it
+        print_ast = "--ast" in args
+        if print_ast:
+            args.remove("--ast")
 
         if len(args) > 1:
-            print("Usage: hill.py <script>")
+            print("Usage: hill.py [--ast] <script>")
             exit(64)
         elif len(args) == 1:
-            self.run_program(Path(args[0]))
+            self.run_program(args[0], print_ast=print_ast)
         else:
-            self.run_prompt()
+            self.run_prompt(print_ast=print_ast)
+
+    @classmethod
+    def compile(cls, source: str) -> CompiledSource:
+        """Scans and parses `source`, reusing the cached result if the same source was compiled recently."""
+        return cls.parse_cache.compile(source)
+
+    @classmethod
+    def run(cls, source: str, print_ast: bool = False):
+        compiled = cls.compile(source)
+
+        if compiled.had_error:
+            return
 
-    @staticmethod
-    def run(source: str):
-        scanner = Scanner(source=source)
-        tokens = scanner.scan_tokens()
-        parser = Parser(tokens=tokens)
-        expression = parser.parse()
+        if print_ast:
+            # Imported here, only `--ast` needs the printer at startup
+            from ast_printer import AstPrinter
 
-        if errors.had_error:
+            print(AstPrinter(reverse_polish_notation=True).print(compiled.expression))
             return
 
-        printer = AstPrinter(reverse_polish_notation=True)
-        print(printer.print(expression))
+        cls.interpreter.interpret(compiled.expression)
 
 
-    def run_program(self, file_path: Path):
+    def run_program(self, file_path: str, print_ast: bool = False):
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 source = f.read()
-                self.run(source)
+                self.run(source, print_ast=print_ast)
 
                 if errors.had_error:
                     exit(1)
+                if errors.had_runtime_error:
+                    exit(70)
         except FileNotFoundError:
             print(f"[Error]: Could not open file: {file_path}")
 
-    def run_prompt(self):
+    def run_prompt(self, print_ast: bool = False):
         print("Hill Language REPL (Python Implementation)")
         print("Press Ctrl+D to exit")
 
@@ -54,8 +70,9 @@ class Hill:
                 if line.strip() == "exit":
                     break
 
-                self.run(line)
+                self.run(line, print_ast=print_ast)
                 errors.had_error = False
+                errors.had_runtime_error = False
 
             except EOFError:
                 # Ctrl+D
@@ -1,4 +1,5 @@
 from token_type import TokenType
+from line_index import LineIndex
 
 class Token:
     def __init__(
@@ -6,13 +7,32 @@ class Token:
             token_type: TokenType,
             lexeme: str,
             literal,
-            line: int
+            line: int = None,
+            offset: int = None,
+            line_index: LineIndex = None
     ):
         self.token_type = token_type
         self.lexeme = lexeme
         self.literal = literal
-        self.line = line
+        self.offset = offset
+        self.line_index = line_index
+        self._line = line
 
-    def to_string(self) -> str:
-        return f'{self.token_type.value} {self.lexeme} {self.literal} {self.line}'
+    @property
+    def line(self) -> int:
+        """Derived from `offset` on first use when the token was not created with an explicit line."""
+        if self._line is None and self.line_index is not None:
+            self._line = self.line_index.line_of(self.offset)
+
+        return self._line
+
+    @property
+    def column(self):
+        """Column of the first character of the lexeme, or None if the token has no source offset."""
+        if self.line_index is None:
+            return None
 
+        return self.line_index.column_of(self.offset)
+
+    def to_string(self) -> str:
+        return f'{self.token_type} {self.lexeme} {self.literal} {self.line}'
@@ -0,0 +1,260 @@
+from operator import add, sub, mul, truediv, gt, ge, lt, le, eq, ne
+# `threading.Lock` is this same lock, importing it from `_thread` skips loading `threading` at startup
+from _thread import allocate_lock as Lock
+
+from expr import Visitor, Expr, BinaryExpr, UnaryExpr, GroupExpr, LiteralExpr
+from hill_token import Token, TokenType
+from rope import Rope, concat
+
+import errors
+
+"""
+Tree-walking evaluator that specializes hot `BinaryExpr` nodes on the operand types they see.
+
+Every BinaryExpr carries an `InlineCache`. While a node is generic its operands are type checked
+on each evaluation and the cache counts how many evaluations in a row saw the same pair of operand
+types (two numbers, or two strings where either may be a `Rope`). After `SPECIALIZE_THRESHOLD` such
+evaluations the node is specialized: later evaluations only check that the operands still have
+exactly those types and call the operation directly. When the check fails the node is deoptimized
+back to the generic path and may specialize again, unless it has already been deoptimized
+`MAX_DEOPTIMIZATIONS` times.
+
+The caches live on the nodes, so trees shared through the parse cache are written to by every
+interpreter (and thread) that evaluates them. That only ever changes how fast a node runs, never its
+result. Profile counts of a node evaluated by several threads at once may be lost, which at worst
+delays its specialization; the interpreter wide `stats()` counters are updated under a lock.
+"""
+
+SPECIALIZE_THRESHOLD = 8
+MAX_DEOPTIMIZATIONS = 4
+
+# Runtime types of a Hill string
+STRING_TYPES = (str, Rope)
+
+# (operator, left operand type, right operand type) -> operation used by a specialized node
+FAST_PATHS = {
+    (TokenType.PLUS, float, float): add,
+    (TokenType.MINUS, float, float): sub,
+    (TokenType.STAR, float, float): mul,
+    (TokenType.SLASH, float, float): truediv,
+    (TokenType.GREATER, float, float): gt,
+    (TokenType.GREATER_EQUAL, float, float): ge,
+    (TokenType.LESS, float, float): lt,
+    (TokenType.LESS_EQUAL, float, float): le,
+    (TokenType.EQUAL_EQUAL, float, float): eq,
+    (TokenType.BANG_EQUAL, float, float): ne,
+}
+
+FAST_PATHS.update({
+    (operator_type, left_type, right_type): operation
+    for operator_type, operation in (
+        (TokenType.PLUS, concat),
+        (TokenType.EQUAL_EQUAL, eq),
+        (TokenType.BANG_EQUAL, ne),
+    )
+    for left_type in STRING_TYPES
+    for right_type in STRING_TYPES
+})
+
+NUMERIC_OPERATIONS = {
+    TokenType.MINUS: sub,
+    TokenType.STAR: mul,
+    TokenType.SLASH: truediv,
+    TokenType.GREATER: gt,
+    TokenType.GREATER_EQUAL: ge,
+    TokenType.LESS: lt,
+    TokenType.LESS_EQUAL: le,
+}
+
+
+class HillRuntimeError(Exception):
+    def __init__(self, token: Token, message: str):
+        super().__init__(message)
+        self.token = token
+        self.message = message
+
+
+class InlineCache:
+    """Per node type profile and, once the node is specialized, its fast path."""
+    def __init__(self):
+        self.observed_types = None
+        self.observations = 0
+        self.deoptimizations = 0
+        # (left type, right type, operation), read and written as one tuple so threads never see a mismatch
+        self.specialized = None
+
+
+class Interpreter(Visitor):
+    def __init__(self):
+        self.specializations = 0
+        self.deoptimizations = 0
+        # Guards the counters above, they change once per (de)specialization so this is off the hot path
+        self.lock = Lock()
+
+    def interpret(self, expr: Expr):
+        """Evaluates `expr` and prints the result, reporting runtime errors instead of raising them."""
+        try:
+            value = self.evaluate(expr)
+            print(self.stringify(value))
+        except HillRuntimeError as error:
+            errors.runtime_error(error)
+
+    def evaluate(self, expr: Expr):
+        return expr.accept(self)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "specializations": self.specializations,
+                "deoptimizations": self.deoptimizations,
+            }
+
+    @staticmethod
+    def stringify(value) -> str:
+        if value is None:
+            return "nil"
+        if value is True:
+            return "true"
+        if value is False:
+            return "false"
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+
+        return str(value)
+
+    @staticmethod
+    def is_truthy(value) -> bool:
+        return value is not None and value is not False
+
+    @staticmethod
+    def is_equal(left, right) -> bool:
+        if isinstance(left, STRING_TYPES) and isinstance(right, STRING_TYPES):
+            return left == right
+
+        # No coercion between types, in particular `true == 1` is false
+        return type(left) is type(right) and left == right
+
+    def visit_literalexpr(self, expr: LiteralExpr):
+        return expr.value
+
+    def visit_groupexpr(self, expr: GroupExpr):
+        return self.evaluate(expr.expr)
+
+    def visit_unaryexpr(self, expr: UnaryExpr):
+        # A run of prefix operators is unwound iteratively, it can be as deep as it is long
+        operators = []
+        node = expr
+
+        while type(node) is UnaryExpr:
+            operators.append(node.operator)
+            node = node.expr_right
+
+        value = self.evaluate(node)
+
+        for operator in reversed(operators):
+            if operator.token_type == TokenType.BANG:
+                value = not self.is_truthy(value)
+            elif type(value) is not float:
+                raise HillRuntimeError(operator, "Operand must be a number.")
+            else:
+                value = -value
+
+        return value
+
+    def visit_binaryexpr(self, expr: BinaryExpr):
+        # Left-associative chains such as `a + b + c + ...` are as deep as they are wide,
+        # so walk down the left spine iteratively and fold the results back up
+        spine = []
+        node = expr
+
+        while type(node) is BinaryExpr:
+            spine.append(node)
+            node = node.expr_left
+
+        value = self.evaluate(node)
+
+        for node in reversed(spine):
+            value = self.binary(node, value, self.evaluate(node.expr_right))
+
+        return value
+
+    def binary(self, expr: BinaryExpr, left, right):
+        cache = expr.inline_cache
+        if cache is None:
+            cache = expr.inline_cache = InlineCache()
+
+        specialized = cache.specialized
+        if specialized is not None:
+            left_type, right_type, operation = specialized
+
+            if type(left) is left_type and type(right) is right_type:
+                try:
+                    return operation(left, right)
+                except ZeroDivisionError:
+                    raise HillRuntimeError(expr.operator, "Division by zero.")
+
+            self.deoptimize(cache)
+
+        value = self.binary_generic(expr.operator, left, right)
+        self.observe(expr.operator.token_type, cache, left, right)
+
+        return value
+
+    def binary_generic(self, operator: Token, left, right):
+        operator_type = operator.token_type
+
+        if operator_type == TokenType.COMMA:
+            return right
+
+        if operator_type == TokenType.EQUAL_EQUAL:
+            return self.is_equal(left, right)
+
+        if operator_type == TokenType.BANG_EQUAL:
+            return not self.is_equal(left, right)
+
+        if operator_type == TokenType.PLUS:
+            if type(left) is float and type(right) is float:
+                return left + right
+            if isinstance(left, STRING_TYPES) and isinstance(right, STRING_TYPES):
+                return concat(left, right)
+
+            raise HillRuntimeError(operator, "Operands must be two numbers or two strings.")
+
+        if type(left) is not float or type(right) is not float:
+            raise HillRuntimeError(operator, "Operands must be numbers.")
+
+        try:
+            return NUMERIC_OPERATIONS[operator_type](left, right)
+        except ZeroDivisionError:
+            raise HillRuntimeError(operator, "Division by zero.")
+
+    def observe(self, operator_type: TokenType, cache: InlineCache, left, right):
+        """Records the operand types of a generic evaluation and specializes the node once they are stable."""
+        operand_types = (type(left), type(right))
+        operation = FAST_PATHS.get((operator_type, *operand_types))
+
+        if operation is None:
+            cache.observed_types = None
+            cache.observations = 0
+            return
+
+        if operand_types == cache.observed_types:
+            cache.observations += 1
+        else:
+            cache.observed_types = operand_types
+            cache.observations = 1
+
+        if cache.observations >= SPECIALIZE_THRESHOLD and cache.deoptimizations < MAX_DEOPTIMIZATIONS:
+            cache.specialized = (*operand_types, operation)
+
+            with self.lock:
+                self.specializations += 1
+
+    def deoptimize(self, cache: InlineCache):
+        cache.specialized = None
+        cache.observed_types = None
+        cache.observations = 0
+        cache.deoptimizations += 1
+
+        with self.lock:
+            self.deoptimizations += 1
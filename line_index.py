@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+
+
+class LineIndex:
+    """
+    Offsets at which each line of a source string starts, built in one pass over the source.
+    Lines and columns start from index 1.
+    """
+    def __init__(self, source: str):
+        line_starts: list[int] = [0]
+        find = source.find
+
+        # `str.find` searches in C, much faster than inspecting one character at a time.
+        newline = find('\n')
+        while newline != -1:
+            line_starts.append(newline + 1)
+            newline = find('\n', newline + 1)
+
+        self.line_starts = line_starts
+
+    @classmethod
+    def from_line_starts(cls, line_starts: list[int]) -> LineIndex:
+        line_index = cls.__new__(cls)
+        line_index.line_starts = line_starts
+
+        return line_index
+
+    def line_of(self, offset: int) -> int:
+        """Returns the line containing `offset`."""
+        return bisect_right(self.line_starts, offset)
+
+    def column_of(self, offset: int) -> int:
+        """Returns the column of `offset` within its line."""
+        return offset - self.line_starts[self.line_of(offset) - 1] + 1
+
+    def __len__(self) -> int:
+        return len(self.line_starts)
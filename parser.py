@@ -1,10 +1,13 @@
+from __future__ import annotations
+
 from hill_token import Token, TokenType
 from expr import Expr, BinaryExpr, UnaryExpr, GroupExpr, LiteralExpr
-from typing import List
 
 import errors
 
 """
+statement      → block | expression ";"? ;           the ";" may only be left out before EOF or a "}"
+block          → "{" statement* "}" ;
 expression     → comma ;
 comma          → equality ( "," equality )* 
 equality       → comparison ( ( "!=" | "==" ) comparison )* ;
@@ -14,6 +17,10 @@ factor         → unary ( ( "/" | "*" ) unary )* ;
 unary          → ( "!" | "-" ) unary | primary ;
 primary        → NUMBER | STRING | "true" | "false" | "nil" | "(" expression ")" ;
 
+nesting:
+  Groups and blocks nest at most MAX_NESTING_DEPTH (64) levels deep, counted together.
+  Anything deeper is reported as "Too much nesting." instead of being parsed.
+
 expression:
   An expression allows equality-type operations.
 
@@ -37,16 +44,87 @@ evaluation notes:
 
 N_LITERAL_TYPE = 5
 
+# Deepest nesting of `( ... )` groups and `{ ... }` blocks the recursive descent will follow.
+# Each level costs about ten Python frames, so this keeps far clear of the recursion limit.
+MAX_NESTING_DEPTH = 64
+
 class ParserError(Exception):
-    def __init__(self, token: Token, message: str):
+    def __init__(self, token: Token, message: str, partial: Expr | Block | None = None):
         errors.error(token, message)
         super().__init__(message)
+        self.token = token
+        self.message = message
+        # A statement that parsed before the error, e.g. an expression only missing its `;`
+        # or the statements of a block that is missing its `}`
+        self.partial = partial
+
+class Block:
+    """A brace-delimited `{ ... }` body."""
+    def __init__(self, statements: list[Expr | Block]):
+        self._statements = statements
+        # Errors recovered from while parsing the body, including those of eagerly parsed nested blocks
+        self.diagnostics: list[ParserError] = []
+
+    @property
+    def statements(self) -> list[Expr | Block]:
+        return self._statements
+
+class LazyBlock(Block):
+    """
+    A block that was only matched by `Parser.pre_parse`.
+    Its body (tokens `opening + 1` up to `closing`) is parsed the first time `statements` is read and then cached.
+    `depth` is the nesting depth of the body, so the nesting limit counts the same as in an eager parse.
+    """
+    def __init__(self, tokens: list[Token], opening: int, closing: int, block_ends: dict[int, int], depth: int):
+        super().__init__(statements=None)
+        self.tokens = tokens
+        self.opening = opening
+        self.closing = closing
+        self.block_ends = block_ends
+        self.depth = depth
+
+    @property
+    def is_parsed(self) -> bool:
+        return self._statements is not None
+
+    @property
+    def statements(self) -> list[Expr | Block]:
+        if self._statements is None:
+            parser = Parser(
+                tokens=self.tokens,
+                start=self.opening + 1,
+                end=self.closing,
+                block_ends=self.block_ends,
+                depth=self.depth
+            )
+            self._statements, self.diagnostics = parser.parse_all()
+
+        return self._statements
 
 class Parser:
     current: int = 0
 
-    def __init__(self, tokens: List[Token]):
+    def __init__(
+            self,
+            tokens: list[Token],
+            start: int = 0,
+            end: int | None = None,
+            block_ends: dict[int, int] | None = None,
+            depth: int = 0
+    ):
+        """
+        Parses `tokens[start:end]`, `end` defaults to the index of the trailing EOF token.
+        `block_ends` maps the index of each `{` to its matching `}`, see `pre_parse`.
+        `depth` is the nesting depth the tokens are at, non zero for the body of a `LazyBlock`.
+        """
         self.tokens = tokens
+        self.current = start
+        self.end = end if end is not None else len(tokens) - 1
+        self.block_ends = block_ends
+        self.start_depth = depth
+        self.depth = depth
+        # Set when `parse` fails, unlike the process wide `errors.had_error`
+        self.had_error = False
 
     def peek(self) -> Token:
         return self.tokens[self.current]
@@ -58,7 +136,7 @@ class Parser:
         return self.tokens[self.current - rewind]
 
     def is_at_end(self) -> bool:
-        return self.peek().token_type == TokenType.EOF
+        return self.current >= self.end
 
     def advance(self) -> Token:
         if not self.is_at_end():
@@ -169,18 +247,21 @@ class Parser:
 
     def unary(self) -> Expr:
         """unary          → ( "!" | "-" ) unary | primary ;"""
-        if self.match(TokenType.BANG, TokenType.MINUS):
-            operator: Token = self.prvs()
-            right: Expr = self.unary()
+        # Iterative, so a long run of prefix operators cannot exhaust the Python stack
+        operators: list[Token] = []
+
+        while self.match(TokenType.BANG, TokenType.MINUS):
+            operators.append(self.prvs())
+
+        expr: Expr = self.primary()
 
+        for operator in reversed(operators):
             expr = UnaryExpr(
                 operator=operator,
-                expr_right=right
+                expr_right=expr
             )
 
-            return expr
-
-        return self.primary()
+        return expr
 
     def primary(self) -> Expr:
         """primary        → NUMBER | STRING | "true" | "false" | "nil" | "(" expression ")" ;"""
@@ -197,8 +278,10 @@ class Parser:
             return LiteralExpr(None)
 
         elif self.match(TokenType.LEFT_PAREN):
+            self.enter_nesting()
             expr: Expr = self.expression()
             self.consume(TokenType.RIGHT_PAREN, "Expected ')' after expression.")
+            self.depth -= 1
 
             return GroupExpr(expr)
 
@@ -206,20 +289,40 @@ class Parser:
             raise ParserError(self.peek(), "Unexpected token.")
 
 
+    def enter_nesting(self):
+        """Called after consuming a `(` or `{`, the matching exit is `self.depth -= 1`."""
+        if self.depth >= MAX_NESTING_DEPTH:
+            raise ParserError(self.prvs(), "Too much nesting.")
+
+        self.depth += 1
+
     def consume(self, token_type: TokenType, message: str):
         if self.check(token_type):
             return self.advance()
 
         raise ParserError(self.peek(), message)
 
-    def sync_parser(self):
+    def sync_parser(self, in_block: bool = False):
+        """Skips to the next statement boundary. With `in_block` it stops in front of a `}` instead of passing it."""
+        if in_block and self.check(TokenType.RIGHT_BRACE):
+            return
+
+        # A `{` is where the next statement starts. Stopping in front of it still makes progress,
+        # because `block` always consumes it. The other boundary tokens cannot start a statement yet.
+        if self.check(TokenType.LEFT_BRACE):
+            return
+
         self.advance()
 
         while not self.is_at_end():
             if self.prvs().token_type == TokenType.SEMICOLON:
                 return
 
+            if in_block and self.peek().token_type == TokenType.RIGHT_BRACE:
+                return
+
             if self.peek().token_type in {
+                TokenType.LEFT_BRACE,
                 TokenType.CLASS,
                 TokenType.FUN,
                 TokenType.VAR,
@@ -237,4 +340,136 @@ class Parser:
         try:
             return self.expression()
         except ParserError:
+            self.depth = self.start_depth
+            self.had_error = True
             return None
+
+    def pre_parse(self) -> list[ParserError]:
+        """
+        Matches every `{` with its `}` in one linear pass over the tokens, without parsing anything.
+        Afterwards `block` skips over block bodies and returns `LazyBlock`s instead of parsing them.
+        A `{` that is never closed is reported here and its block runs until the end of the tokens.
+        """
+        block_ends: dict[int, int] = {}
+        open_braces: list[int] = []
+        diagnostics: list[ParserError] = []
+
+        for index in range(self.current, self.end):
+            token_type = self.tokens[index].token_type
+
+            if token_type == TokenType.LEFT_BRACE:
+                open_braces.append(index)
+            elif token_type == TokenType.RIGHT_BRACE and open_braces:
+                block_ends[open_braces.pop()] = index
+
+        for index in open_braces:
+            block_ends[index] = self.end
+            diagnostics.append(ParserError(self.tokens[self.end], "Expected '}' after block."))
+
+        self.block_ends = block_ends
+
+        return diagnostics
+
+    def block(self) -> Block:
+        """block          → "{" statement* "}" ;"""
+        opening = self.current
+
+        self.advance()
+        block = Block([])
+
+        try:
+            self.enter_nesting()
+        except ParserError as error:
+            # Skipped whole, so one diagnostic covers the block however deep its nesting goes on
+            block.diagnostics.append(error)
+            self.skip_block()
+            return block
+
+        if self.block_ends is not None:
+            self.depth -= 1
+            closing = self.block_ends[opening]
+            self.current = closing
+            self.match(TokenType.RIGHT_BRACE)
+
+            return LazyBlock(self.tokens, opening, closing, self.block_ends, depth=self.depth + 1)
+
+        depth = self.depth
+
+        # Errors are recovered from inside the block, so they cannot unwind past its `}`
+        while not self.check(TokenType.RIGHT_BRACE) and not self.is_at_end():
+            try:
+                self.collect(self.statement(), block.statements, block.diagnostics)
+            except ParserError as error:
+                self.collect(error.partial, block.statements, block.diagnostics)
+                block.diagnostics.append(error)
+                self.depth = depth
+                self.sync_parser(in_block=True)
+
+        if not self.check(TokenType.RIGHT_BRACE):
+            raise ParserError(self.peek(), "Expected '}' after block.", partial=block)
+
+        self.advance()
+        self.depth -= 1
+
+        return block
+
+    def skip_block(self):
+        """Moves past the `}` matching the `{` just consumed, without parsing anything in between."""
+        open_braces = 1
+
+        while open_braces and not self.is_at_end():
+            token_type = self.advance().token_type
+
+            if token_type == TokenType.LEFT_BRACE:
+                open_braces += 1
+            elif token_type == TokenType.RIGHT_BRACE:
+                open_braces -= 1
+
+    @staticmethod
+    def collect(statement: Expr | Block | None, statements: list[Expr | Block], diagnostics: list[ParserError]):
+        """Appends a parsed statement, and the errors recovered inside it if it is an eagerly parsed block."""
+        if statement is None:
+            return
+
+        statements.append(statement)
+
+        if type(statement) is Block:
+            diagnostics.extend(statement.diagnostics)
+
+    def statement(self) -> Expr | Block:
+        """statement      → block | expression ";"? ;"""
+        if self.check(TokenType.LEFT_BRACE):
+            return self.block()
+
+        expr: Expr = self.expression()
+
+        if not self.is_at_end() and not self.check(TokenType.RIGHT_BRACE) and not self.match(TokenType.SEMICOLON):
+            raise ParserError(self.peek(), "Expected ';' after expression.", partial=expr)
+
+        return expr
+
+    def parse_all(self, lazy_blocks: bool = False) -> tuple[list[Expr | Block], list[ParserError]]:
+        """
+        Parses statements until EOF without stopping at the first error.
+        After an error the parser synchronizes at the next statement boundary and carries on,
+        so one pass returns every statement that parsed along with every diagnostic.
+        Each token is consumed at most once by either parsing or `sync_parser`, so recovery stays linear.
+
+        With `lazy_blocks` the tokens are pre-parsed first and block bodies are only parsed when first used.
+        """
+        statements: list[Expr | Block] = []
+        diagnostics: list[ParserError] = []
+
+        if lazy_blocks and self.block_ends is None:
+            diagnostics.extend(self.pre_parse())
+
+        while not self.is_at_end():
+            try:
+                self.collect(self.statement(), statements, diagnostics)
+            except ParserError as error:
+                self.collect(error.partial, statements, diagnostics)
+                diagnostics.append(error)
+                self.depth = self.start_depth
+                self.sync_parser()
+
+        return statements, diagnostics
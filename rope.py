@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+"""
+Runtime string value for concatenation results.
+
+Concatenating two strings creates a `Rope` node pointing at both halves instead of copying them,
+so a chain `"a" + b + c + ...` costs O(1) per `+`. The characters are joined into a flat `str`
+only once, the first time the rope is printed, compared or hashed, and the result is cached.
+"""
+
+# Concatenations shorter than this are copied straight away, small copies are cheaper than a Rope.
+MIN_ROPE_LENGTH = 64
+
+
+class Rope:
+    def __init__(self, left: str | Rope, right: str | Rope):
+        self.left = left
+        self.right = right
+        self.length = len(left) + len(right)
+        self.flat = None
+
+    def flatten(self) -> str:
+        if self.flat is None:
+            parts = []
+            # Iterative, a left-leaning chain of concatenations can be as deep as it is long
+            stack = [self]
+
+            while stack:
+                node = stack.pop()
+
+                if type(node) is str:
+                    parts.append(node)
+                    continue
+
+                # The halves are read before `flat`. Another thread flattening the same node sets `flat`
+                # before it clears the halves, so either `flat` is seen here or both halves are still there.
+                left, right = node.left, node.right
+
+                if node.flat is not None:
+                    parts.append(node.flat)
+                else:
+                    stack.append(right)
+                    stack.append(left)
+
+            self.flat = ''.join(parts)
+            # The halves are no longer needed once the flat string exists
+            self.left = self.right = None
+
+        return self.flat
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __str__(self) -> str:
+        return self.flatten()
+
+    def __repr__(self) -> str:
+        return f"Rope({self.flatten()!r})"
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Rope):
+            return self.length == other.length and self.flatten() == other.flatten()
+        if isinstance(other, str):
+            return self.length == len(other) and self.flatten() == other
+
+        return NotImplemented
+
+    def __ne__(self, other) -> bool:
+        equal = self.__eq__(other)
+
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self) -> int:
+        return hash(self.flatten())
+
+
+def concat(left: str | Rope, right: str | Rope) -> str | Rope:
+    """Concatenation of two Hill strings."""
+    if len(left) + len(right) < MIN_ROPE_LENGTH:
+        return str(left) + str(right)
+
+    return Rope(left, right)
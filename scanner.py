@@ -1,5 +1,7 @@
-from typing import List, Union
+from __future__ import annotations
+
 from hill_token import Token, TokenType
+from line_index import LineIndex
 
 import errors
 
@@ -7,7 +9,6 @@ class Scanner:
     # Scanning location tracking variables
     start       :int = 0
     current     :int = 0
-    line        :int = 1 # lines start from index 1
 
     # token dict (single character)
     SINGLE_CHAR_MAP = {
@@ -45,7 +46,11 @@ class Scanner:
 
     def __init__(self, source: str):
         self.source = source
-        self.tokens: List[Token] = []
+        self.tokens: list[Token] = []
+        # Set when this scanner reports an error, unlike the process wide `errors.had_error`
+        self.had_error = False
+        # Lines and columns are derived from token offsets through this index only when they are needed
+        self.line_index = LineIndex(source)
 
     def buffer_consumed(self) -> bool:
         """Checks if `current` pointer has read the entire source string"""
@@ -98,23 +103,29 @@ class Scanner:
             token_type=token_type,
             lexeme=lexeme,
             literal=literal,
-            line=self.line
+            offset=self.start,
+            line_index=self.line_index
         ))
 
-    def read_in_string_literal(self):
-        while self.peek() != '"' and not self.buffer_consumed():
-            if self.peek() == '\n':
-                self.line += 1
+    def error_at_start(self, message: str):
+        """Reports an error at the lexeme that begins at `start`."""
+        self.had_error = True
+        # TODO: Fix this, create a new type or something that makes sense. EOF is just placeholder.
+        errors.error(
+            Token(TokenType.EOF, "", None, offset=self.start, line_index=self.line_index),
+            message=message
+        )
 
-            self.get_current_char_and_advance()
+    def read_in_string_literal(self):
+        closing_quote = self.source.find('"', self.current)
 
-        if self.buffer_consumed():
-            # TODO: Fix this, create a new type or something that makes sense. EOF is just placeholder.
-            errors.error(Token(TokenType.EOF, "", None, self.line), message='Unterminated string literal')
+        if closing_quote == -1:
+            self.current = len(self.source)
+            self.error_at_start(message='Unterminated string literal')
             return
 
-        # Consume the closing `"`
-        self.get_current_char_and_advance()
+        # Consume up to and including the closing `"`
+        self.current = closing_quote + 1
 
         #        `start ptr`--⌄           `current`--⌄
         # This is called when "source buffer literal"-
@@ -202,17 +213,14 @@ class Scanner:
         elif char == '/':
             # Single line comments
             if self.match_next_token('/'):
-                while self.peek() != '\n' and not self.buffer_consumed():
-                    self.get_current_char_and_advance()
+                newline = self.source.find('\n', self.current)
+                self.current = newline if newline != -1 else len(self.source)
 
             # Multi Line comments
             elif self.match_next_token('*'):
                 cnt = 1
 
                 while cnt > 0 and not self.buffer_consumed():
-                    if self.peek() == '\n':
-                        self.line += 1
-
                     if self.peek() == '/' and self.peek(jump=1) == '*':
                         cnt += 1
                         self.get_current_char_and_advance()
@@ -228,22 +236,13 @@ class Scanner:
                     self.get_current_char_and_advance()
 
                 if cnt > 0:
-                    # TODO: Fix this, create a new type or something that makes sense. EOF is just placeholder.
-                    errors.error(
-                        Token(TokenType.EOF, "", None, self.line),
-                        message='Unterminated multi-line comment'
-                    )
+                    self.error_at_start(message='Unterminated multi-line comment')
             else:
                 self.add_token(token_type=TokenType.SLASH)
 
             return
-        # New line
-        elif char == '\n':
-            self.line += 1
-
-            return
-        # Junk characters
-        elif char == '\r' or char == '\t' or char == ' ':
+        # Junk characters, new lines are tracked by `line_index`
+        elif char == '\n' or char == '\r' or char == '\t' or char == ' ':
 
             return
         elif char == '"':
@@ -259,14 +258,11 @@ class Scanner:
 
             return
         else:
-            errors.error(
-                Token(TokenType.EOF, "", None, self.line),
-                message="Unexpected Character"
-            )
+            self.error_at_start(message="Unexpected Character")
 
             return
 
-    def scan_tokens(self) -> List[Token]:
+    def scan_tokens(self) -> list[Token]:
         while not self.buffer_consumed():
             self.start = self.current
             self.gen_token_list()
@@ -275,7 +271,8 @@ class Scanner:
             token_type=TokenType.EOF,
             lexeme="",
             literal=None,
-            line=self.line
+            offset=self.current,
+            line_index=self.line_index
         )
 
         self.tokens.append(
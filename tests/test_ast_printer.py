@@ -0,0 +1,20 @@
+import pytest
+
+from ast_printer import AstPrinter
+from parser import Parser
+from scanner import Scanner
+
+
+@pytest.mark.parametrize("reverse_polish_notation", [False, True])
+def test_print_matches_the_visitor_methods(reverse_polish_notation):
+    expression = Parser(tokens=Scanner(source='-(1 + 2) * "a" == nil, !true').scan_tokens()).parse()
+    printer = AstPrinter(reverse_polish_notation=reverse_polish_notation)
+
+    assert isinstance(expression.accept(printer), str)
+    assert printer.print(expression) == expression.accept(printer)
+
+
+def test_print_handles_trees_deeper_than_the_python_stack():
+    expression = Parser(tokens=Scanner(source=" + ".join(["1"] * 5000)).scan_tokens()).parse()
+
+    assert AstPrinter().print(expression).count("(+") == 4999
@@ -0,0 +1,115 @@
+import pytest
+
+import errors
+from interpreter import HillRuntimeError, Interpreter, MAX_DEOPTIMIZATIONS, SPECIALIZE_THRESHOLD
+from parser import Parser
+from scanner import Scanner
+
+
+def parse(source: str):
+    return Parser(tokens=Scanner(source=source).scan_tokens()).parse()
+
+
+def set_operands(expr, left, right):
+    expr.expr_left.value = left
+    expr.expr_right.value = right
+
+
+@pytest.fixture(autouse=True)
+def reset_runtime_error():
+    yield
+    errors.had_runtime_error = False
+
+
+@pytest.mark.parametrize("source, printed", [
+    ("1 + 2 * 3", "7"),
+    ("7 / 2", "3.5"),
+    ('"a" + "b" == "ab"', "true"),
+    ("true == 1", "false"),
+    ("!nil, -(2 - 5)", "3"),
+    ("nil", "nil"),
+])
+def test_interpret_prints_the_value(capsys, source, printed):
+    Interpreter().interpret(parse(source))
+
+    assert capsys.readouterr().out == printed + "\n"
+
+
+def test_node_specializes_after_the_threshold():
+    interpreter = Interpreter()
+    expr = parse("1 + 2")
+
+    for _ in range(SPECIALIZE_THRESHOLD - 1):
+        assert interpreter.evaluate(expr) == 3.0
+    assert expr.inline_cache.specialized is None
+
+    assert interpreter.evaluate(expr) == 3.0
+    assert expr.inline_cache.specialized is not None
+    assert interpreter.stats() == {"specializations": 1, "deoptimizations": 0}
+
+    # The fast path gives the same results as the generic one
+    set_operands(expr, 2.5, 0.25)
+    assert interpreter.evaluate(expr) == 2.75
+    assert interpreter.stats() == {"specializations": 1, "deoptimizations": 0}
+
+
+def test_failed_guard_deoptimizes_and_keeps_the_result_correct():
+    interpreter = Interpreter()
+    expr = parse("1 + 2")
+
+    for _ in range(SPECIALIZE_THRESHOLD):
+        interpreter.evaluate(expr)
+
+    set_operands(expr, "a", "b")
+    assert interpreter.evaluate(expr) == "ab"
+    assert expr.inline_cache.specialized is None
+    assert interpreter.stats() == {"specializations": 1, "deoptimizations": 1}
+
+    # Stable again on the new types, so the node specializes a second time
+    for _ in range(SPECIALIZE_THRESHOLD):
+        interpreter.evaluate(expr)
+    assert expr.inline_cache.specialized[:2] == (str, str)
+    assert interpreter.stats() == {"specializations": 2, "deoptimizations": 1}
+
+
+def test_node_stops_specializing_after_max_deoptimizations():
+    interpreter = Interpreter()
+    expr = parse("1 + 2")
+
+    for attempt in range(MAX_DEOPTIMIZATIONS + 2):
+        operands = (1.0, 2.0) if attempt % 2 == 0 else ("a", "b")
+        set_operands(expr, *operands)
+
+        for _ in range(SPECIALIZE_THRESHOLD):
+            interpreter.evaluate(expr)
+
+    assert expr.inline_cache.deoptimizations == MAX_DEOPTIMIZATIONS
+    assert expr.inline_cache.specialized is None
+    assert interpreter.stats() == {"specializations": MAX_DEOPTIMIZATIONS, "deoptimizations": MAX_DEOPTIMIZATIONS}
+
+
+@pytest.mark.parametrize("source, message, column", [
+    ('1 + "a"', "Operands must be two numbers or two strings.", 3),
+    ('1 - "a"', "Operands must be numbers.", 3),
+    ("1 / 0", "Division by zero.", 3),
+    ('-"a"', "Operand must be a number.", 1),
+    ("--true", "Operand must be a number.", 2),
+])
+def test_runtime_errors(capsys, source, message, column):
+    Interpreter().interpret(parse(source))
+
+    assert errors.had_runtime_error
+    assert capsys.readouterr().err == f"{message}\n[line 1, column {column}]\n"
+
+
+def test_division_by_zero_on_the_specialized_path():
+    interpreter = Interpreter()
+    expr = parse("1 / 2")
+
+    for _ in range(SPECIALIZE_THRESHOLD):
+        interpreter.evaluate(expr)
+    assert expr.inline_cache.specialized is not None
+
+    set_operands(expr, 1.0, 0.0)
+    with pytest.raises(HillRuntimeError, match="Division by zero."):
+        interpreter.evaluate(expr)
@@ -0,0 +1,61 @@
+import pytest
+
+from line_index import LineIndex
+from parser import Parser
+from scanner import Scanner
+
+SOURCE = "ab\n\ncd\n"
+
+
+@pytest.mark.parametrize("offset, line, column", [
+    (0, 1, 1),
+    (2, 1, 3),   # the newline ending line 1
+    (3, 2, 1),   # an empty line
+    (4, 3, 1),
+    (6, 3, 3),
+    (7, 4, 1),   # EOF, after the trailing newline
+])
+def test_line_and_column_at_line_boundaries(offset, line, column):
+    line_index = LineIndex(SOURCE)
+
+    assert (line_index.line_of(offset), line_index.column_of(offset)) == (line, column)
+
+
+def test_source_without_newlines():
+    line_index = LineIndex("abc")
+
+    assert len(line_index) == 1
+    assert (line_index.line_of(3), line_index.column_of(3)) == (1, 4)
+    assert len(LineIndex("")) == 1
+
+
+def test_rebuilt_index_matches():
+    rebuilt = LineIndex.from_line_starts(LineIndex(SOURCE).line_starts)
+
+    assert [rebuilt.column_of(offset) for offset in range(8)] == [LineIndex(SOURCE).column_of(offset) for offset in range(8)]
+
+
+def test_tokens_carry_lines_and_columns():
+    tokens = Scanner(source='1 +\n  "a\nb" * 2').scan_tokens()
+
+    assert [(token.lexeme, token.line, token.column) for token in tokens] == [
+        ("1", 1, 1), ("+", 1, 3), ('"a\nb"', 2, 3), ("*", 3, 4), ("2", 3, 6), ("", 3, 7),
+    ]
+
+
+def test_scanner_error_reports_line_and_column(capsys):
+    Scanner(source="1;\n  @").scan_tokens()
+
+    assert capsys.readouterr().err == "[line 2, column 3] Error at end: Unexpected Character\n"
+
+
+def test_parser_error_reports_line_and_column(capsys):
+    Parser(tokens=Scanner(source="1 +\n   * 2").scan_tokens()).parse()
+
+    assert capsys.readouterr().err == "[line 2, column 4] Error at '*': Unexpected token.\n"
+
+
+def test_error_at_end_reports_the_eof_position(capsys):
+    Parser(tokens=Scanner(source="(1\n").scan_tokens()).parse()
+
+    assert capsys.readouterr().err == "[line 2, column 1] Error at end: Expected ')' after expression.\n"
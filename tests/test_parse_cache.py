@@ -0,0 +1,91 @@
+import threading
+import tracemalloc
+
+import errors
+from parse_cache import ParseCache, RETAINED_BYTES_PER_TOKEN
+from parser import Parser
+from scanner import Scanner
+
+
+def test_hit_miss_and_eviction_counts():
+    cache = ParseCache(max_entries=2)
+
+    for source in ("1", "2", "1", "3", "2"):
+        cache.compile(source)
+
+    assert cache.stats() == {"hits": 1, "misses": 4, "evictions": 2, "entries": 2, "bytes": 2 * (1 + 2 * RETAINED_BYTES_PER_TOKEN)}
+
+
+def test_byte_limit_evicts_least_recently_used():
+    one_token = 1 + 2 * RETAINED_BYTES_PER_TOKEN
+    cache = ParseCache(max_bytes=2 * one_token + 1)
+
+    cache.compile("1+1")
+    cache.compile("2")
+    cache.compile("3")
+
+    assert "1+1" not in cache.entries
+    assert cache.stats()["bytes"] == 2 * one_token
+
+
+def test_byte_limit_counts_tokens_and_tree_not_just_the_source():
+    source = " + ".join(['(1 * "ab") - 3'] * 2000)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tokens = Scanner(source=source).scan_tokens()
+        expression = Parser(tokens=tokens).parse()
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    estimated = ParseCache.size_of(ParseCache().compile(source))
+
+    assert expression is not None
+    assert retained / 2 <= estimated <= retained * 2
+
+
+def test_failing_source_is_not_cached(capsys):
+    cache = ParseCache()
+
+    compiled = cache.compile("1 +")
+
+    assert compiled.had_error and compiled.expression is None
+    assert len(cache) == 0
+
+
+def test_failing_source_is_never_cached_across_threads(capsys):
+    """Other threads compiling valid sources must not hide the failure of a concurrent compile."""
+    cache = ParseCache()
+    start = threading.Barrier(8)
+    results = {}
+
+    def compile_repeatedly(source):
+        start.wait()
+        for _ in range(200):
+            compiled = cache.compile(source)
+            results.setdefault(source, []).append(compiled.had_error)
+
+    threads = [
+        threading.Thread(target=compile_repeatedly, args=(source,))
+        for source in ["1 +", "(2", "3", "4 * 5"] * 2
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert "1 +" not in cache.entries and "(2" not in cache.entries
+    assert all(results["1 +"]) and all(results["(2"])
+    assert not any(results["3"]) and not any(results["4 * 5"])
+    errors.had_error = False
+
+
+def test_failure_flag_ignores_errors_reported_by_other_compiles(capsys):
+    cache = ParseCache()
+    errors.had_error = True
+
+    assert not cache.compile("1 + 2").had_error
+    assert len(cache) == 1
+    errors.had_error = False
@@ -0,0 +1,154 @@
+import pytest
+
+from ast_printer import AstPrinter
+from parser import Parser, Block, LazyBlock, MAX_NESTING_DEPTH
+from scanner import Scanner
+
+
+def parse_all(source: str, lazy_blocks: bool = False):
+    return Parser(tokens=Scanner(source=source).scan_tokens()).parse_all(lazy_blocks=lazy_blocks)
+
+
+def printed(statements) -> list:
+    return [AstPrinter().print(statement) for statement in statements]
+
+
+def rendered(statements) -> list:
+    """Like `printed`, with each block rendered as the list of its own statements."""
+    return [
+        rendered(statement.statements) if isinstance(statement, Block) else AstPrinter().print(statement)
+        for statement in statements
+    ]
+
+
+def all_messages(statements, diagnostics) -> list:
+    """Every diagnostic message, including those of lazy blocks, which are only known once their bodies are parsed."""
+    messages = [error.message for error in diagnostics]
+
+    for statement in statements:
+        if isinstance(statement, LazyBlock):
+            messages.extend(all_messages(statement.statements, statement.diagnostics))
+
+    return sorted(messages)
+
+
+def deepest_block(statements):
+    while statements and isinstance(statements[0], Block):
+        block = statements[0]
+        statements = block.statements
+
+    return block
+
+
+def test_parse_all_reports_every_error_in_one_pass(capsys):
+    statements, diagnostics = parse_all("1 + ; 2; * 3; 4")
+
+    assert printed(statements) == ["2.0", "4.0"]
+    assert [error.message for error in diagnostics] == ["Unexpected token.", "Unexpected token."]
+
+
+def test_expression_missing_only_its_semicolon_is_kept(capsys):
+    statements, diagnostics = parse_all("1 2; 4;")
+
+    assert printed(statements) == ["1.0", "4.0"]
+    assert [error.message for error in diagnostics] == ["Expected ';' after expression."]
+    assert AstPrinter().print(diagnostics[0].partial) == "1.0"
+
+
+def test_error_inside_block_is_recovered_within_the_block(capsys):
+    statements, diagnostics = parse_all("{ 1 + ; 2; } 3;")
+
+    assert printed(statements[1:]) == ["3.0"]
+    assert printed(statements[0].statements) == ["2.0"]
+    assert [error.message for error in statements[0].diagnostics] == ["Unexpected token."]
+    assert [error.message for error in diagnostics] == ["Unexpected token."]
+    assert "'}'" not in capsys.readouterr().err
+
+
+def test_nested_block_errors_stop_at_their_closing_brace(capsys):
+    statements, diagnostics = parse_all("{ { * 1 } 2 } 3")
+
+    outer = statements[0]
+    assert printed(outer.statements[1:]) == ["2.0"]
+    assert outer.statements[0].statements == []
+    assert printed(statements[1:]) == ["3.0"]
+    assert len(diagnostics) == 1
+
+
+def test_unclosed_block_keeps_its_statements(capsys):
+    statements, diagnostics = parse_all("1; { 2; 3")
+
+    assert printed(statements[:1]) == ["1.0"]
+    assert printed(statements[1].statements) == ["2.0", "3.0"]
+    assert [error.message for error in diagnostics] == ["Expected '}' after block."]
+
+
+def test_block_nested_too_deep_is_reported_once(capsys):
+    statements, diagnostics = parse_all("{" * 100 + "1;" + "}" * 100 + " 2;")
+
+    assert printed(statements[1:]) == ["2.0"]
+    assert [error.message for error in diagnostics] == ["Too much nesting."]
+
+
+@pytest.mark.parametrize("lazy_blocks", [False, True])
+def test_missing_semicolon_before_a_block_keeps_the_block(capsys, lazy_blocks):
+    statements, diagnostics = parse_all("1 { 2; 5; } 3;", lazy_blocks=lazy_blocks)
+
+    assert rendered(statements) == ["1.0", ["2.0", "5.0"], "3.0"]
+    assert [error.message for error in diagnostics] == ["Expected ';' after expression."]
+
+
+@pytest.mark.parametrize("source", [
+    "1; { 2; { 3; } 4; } 5",
+    "{ 1 + ; 2; } 3;",
+    "{ { * 1 } 2 } 3",
+    "1 { 2; 5; } 3;",
+    "1; { 2; { 3",
+    "{ (1 + 2) * -3 == 4, 5 } {}",
+])
+def test_lazy_and_eager_blocks_agree(capsys, source):
+    eager_statements, eager_diagnostics = parse_all(source)
+    lazy_statements, lazy_diagnostics = parse_all(source, lazy_blocks=True)
+
+    assert rendered(lazy_statements) == rendered(eager_statements)
+    assert all_messages(lazy_statements, lazy_diagnostics) == all_messages(eager_statements, eager_diagnostics)
+
+
+def test_lazy_block_body_is_parsed_on_first_read_only(capsys):
+    statements, diagnostics = parse_all("{ 1; { 2 + ; } } 3;", lazy_blocks=True)
+    outer = statements[0]
+
+    assert isinstance(outer, LazyBlock) and not outer.is_parsed
+    assert diagnostics == []
+    assert capsys.readouterr().err == ""
+
+    body = outer.statements
+    inner = body[1]
+
+    assert outer.is_parsed and outer.statements is body
+    assert isinstance(inner, LazyBlock) and not inner.is_parsed
+    assert inner.block_ends is outer.block_ends
+
+    assert inner.statements == []
+    assert [error.message for error in inner.diagnostics] == ["Unexpected token."]
+
+
+def test_unclosed_brace_in_lazy_mode(capsys):
+    statements, diagnostics = parse_all("1; { 2; { 3", lazy_blocks=True)
+
+    assert [error.message for error in diagnostics] == ["Expected '}' after block.", "Expected '}' after block."]
+    assert rendered(statements) == ["1.0", ["2.0", ["3.0"]]]
+
+
+@pytest.mark.parametrize("lazy_blocks", [False, True])
+def test_nesting_limit_is_the_same_in_lazy_mode(capsys, lazy_blocks):
+    too_deep = MAX_NESTING_DEPTH + 1
+    statements, diagnostics = parse_all("{" * too_deep + "1" + "}" * too_deep, lazy_blocks=lazy_blocks)
+
+    assert all_messages(statements, diagnostics) == ["Too much nesting."]
+    assert deepest_block(statements).statements == []
+
+    statements, diagnostics = parse_all("{" * MAX_NESTING_DEPTH + "1" + "}" * MAX_NESTING_DEPTH, lazy_blocks=lazy_blocks)
+
+    assert all_messages(statements, diagnostics) == []
+    assert printed(deepest_block(statements).statements) == ["1.0"]
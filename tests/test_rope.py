@@ -0,0 +1,89 @@
+import sys
+import threading
+
+from interpreter import Interpreter
+from parser import Parser
+from rope import MIN_ROPE_LENGTH, Rope, concat
+from scanner import Scanner
+
+LONG = "x" * MIN_ROPE_LENGTH
+
+
+def test_short_concatenations_are_copied():
+    assert type(concat("a", "b")) is str
+    assert type(concat("a" * (MIN_ROPE_LENGTH - 2), "b")) is str
+
+    rope = concat("a" * (MIN_ROPE_LENGTH - 1), "b")
+    assert type(rope) is Rope and len(rope) == MIN_ROPE_LENGTH
+
+
+def test_equality_with_strings_and_ropes():
+    rope = concat(LONG, "y")
+    flat = LONG + "y"
+
+    assert rope == flat and flat == rope
+    assert rope == concat(LONG[:1], concat(LONG[1:], "y"))
+    assert rope != LONG + "z" and LONG + "z" != rope
+    assert rope != LONG and not (rope != flat)
+    assert rope != 1
+
+
+def test_hash_matches_the_flat_string():
+    rope = concat(LONG, "y")
+
+    assert hash(rope) == hash(LONG + "y")
+    assert {LONG + "y": 1}[rope] == 1
+
+
+def test_printed_output(capsys):
+    source = " + ".join(['"' + "ab" * 20 + '"'] * 3)
+    Interpreter().interpret(Parser(tokens=Scanner(source=source).scan_tokens()).parse())
+
+    assert capsys.readouterr().out == "ab" * 60 + "\n"
+    assert Interpreter.stringify(concat(LONG, "y")) == LONG + "y"
+    assert str(concat(LONG, "y")) == LONG + "y"
+
+
+def test_flattening_a_deep_left_leaning_chain():
+    depth = 100_000
+    assert depth > sys.getrecursionlimit()
+
+    rope = LONG
+    for _ in range(depth):
+        rope = concat(rope, "y")
+
+    assert type(rope) is Rope
+    assert str(rope) == LONG + "y" * depth
+    assert len(rope) == MIN_ROPE_LENGTH + depth
+
+
+def test_flattening_reuses_flattened_halves():
+    half = concat(LONG, "y")
+    str(half)
+    rope = concat(half, half)
+
+    assert str(rope) == (LONG + "y") * 2
+    assert half.left is None and half.right is None
+
+
+def test_concurrent_flattening_of_shared_halves():
+    shared = LONG
+    for index in range(2000):
+        shared = concat(shared, str(index))
+
+    ropes = [concat(shared, str(index)) for index in range(8)]
+    start = threading.Barrier(len(ropes))
+    results = []
+
+    def flatten(rope):
+        start.wait()
+        results.append(str(rope))
+
+    threads = [threading.Thread(target=flatten, args=(rope,)) for rope in ropes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    flat = str(shared)
+    assert sorted(results) == sorted(flat + str(index) for index in range(8))
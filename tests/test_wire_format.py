@@ -0,0 +1,158 @@
+import math
+import mmap
+from io import BytesIO
+
+import pytest
+
+import errors
+from ast_printer import AstPrinter
+from interpreter import Interpreter
+from parser import Parser
+from scanner import Scanner
+from wire_format import (
+    FORMAT_VERSION, KIND_EXPRESSIONS, KIND_TOKENS, MAGIC, WireDecoder, WireEncoder,
+    dump_expr, dump_tokens, load_expr, load_tokens
+)
+
+SOURCE = 'var total = price * (1 + rate)\n - "discount" == !false, nil;\n// comment\n"ünïcødé ✓" >= 2.5;\n'
+
+
+def scan(source: str):
+    return Scanner(source=source).scan_tokens()
+
+
+def parse(source: str):
+    return Parser(tokens=scan(source)).parse()
+
+
+def described(tokens) -> list:
+    return [(t.token_type, t.lexeme, t.literal, t.line, t.column) for t in tokens]
+
+
+def test_tokens_round_trip_with_lines_and_columns():
+    tokens = scan(SOURCE)
+    decoded = load_tokens(dump_tokens(tokens))
+
+    assert described(decoded) == described(tokens)
+    assert [t.offset for t in decoded] == [t.offset for t in tokens]
+    assert any(t.line == 4 and t.column == 1 for t in decoded)
+
+
+def test_decoding_from_memoryview_and_mmap(tmp_path):
+    tokens = scan(SOURCE)
+    data = dump_tokens(tokens)
+
+    assert described(load_tokens(memoryview(data))) == described(tokens)
+    assert described(load_tokens(bytearray(data))) == described(tokens)
+
+    path = tmp_path / "tokens.hillw"
+    path.write_bytes(data)
+
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        with WireDecoder(mapped) as decoder:
+            decoded = list(decoder.tokens())
+
+        # The decoder released its view of the map, so closing it here must not raise
+    assert described(decoded) == described(tokens)
+
+
+def test_streaming_several_expressions():
+    sources = ["1 + 2 * 3", '-"a" == "a"', "(1 >= 2) != !nil", "4"]
+    trees = [parse(source) for source in sources]
+
+    stream = BytesIO()
+    encoder = WireEncoder(stream, KIND_EXPRESSIONS)
+    for tree in trees:
+        encoder.write_expr(tree)
+    encoder.write_expr(None)
+    encoder.close()
+
+    with WireDecoder(stream.getvalue()) as decoder:
+        decoded = list(decoder.expressions())
+
+    assert decoded[-1] is None
+    assert [AstPrinter().print(tree) for tree in decoded[:-1]] == [AstPrinter().print(tree) for tree in trees]
+
+
+@pytest.mark.parametrize("value", [0.0, -0.0, 1.0, -7.0, 2.5, 2.0 ** 60, -(2.0 ** 53), 1e300, 5e-324, math.inf, -math.inf])
+def test_number_literals_round_trip_exactly(value):
+    tree = parse("1")
+    tree.value = value
+
+    decoded = load_expr(dump_expr(tree)).value
+
+    assert decoded == value and math.copysign(1.0, decoded) == math.copysign(1.0, value)
+
+
+def test_nan_literal_round_trips():
+    tree = parse("1")
+    tree.value = math.nan
+
+    assert math.isnan(load_expr(dump_expr(tree)).value)
+
+
+def test_non_ascii_strings_round_trip():
+    tree = parse('"héllo" + "世界 🌍" + "héllo"')
+
+    assert AstPrinter().print(load_expr(dump_expr(tree))) == AstPrinter().print(tree)
+
+
+def test_expression_operators_keep_their_position():
+    tree = parse('1 +\n  2 -\n  "a"')
+    decoded = load_expr(dump_expr(tree))
+
+    assert (decoded.operator.lexeme, decoded.operator.line, decoded.operator.column) == ("-", 2, 5)
+    assert (decoded.expr_left.operator.line, decoded.expr_left.operator.column) == (1, 3)
+
+
+def test_runtime_error_of_decoded_expression_reports_its_line(capsys):
+    Interpreter().interpret(load_expr(dump_expr(parse('\n1 - "a"'))))
+    errors.had_runtime_error = False
+
+    assert "[line 2, column 3]" in capsys.readouterr().err
+
+
+def test_tokens_without_offsets_keep_their_line():
+    tokens = scan("1 + 2")
+    line_only = [type(token)(token.token_type, token.lexeme, token.literal, line=7) for token in tokens]
+
+    assert [t.line for t in load_tokens(dump_tokens(line_only))] == [7, 7, 7, 7]
+
+
+def test_rejects_bad_magic():
+    with pytest.raises(ValueError, match="Not a Hill wire format document"):
+        load_tokens(b"NOPE" + dump_tokens(scan("1"))[len(MAGIC):])
+
+
+def test_rejects_unsupported_version():
+    with pytest.raises(ValueError, match="Unsupported wire format version"):
+        load_tokens(MAGIC + bytes([FORMAT_VERSION + 1, KIND_TOKENS, 0, 0]))
+
+
+def test_rejects_unknown_kind():
+    with pytest.raises(ValueError, match="Unknown document kind"):
+        load_tokens(MAGIC + bytes([FORMAT_VERSION, 9, 0, 0]))
+
+
+def test_rejects_documents_of_the_other_kind():
+    with pytest.raises(ValueError, match="does not contain expressions"):
+        load_expr(dump_tokens(scan("1")))
+
+
+@pytest.mark.parametrize("dump, load, value", [
+    (dump_tokens, load_tokens, scan(SOURCE)),
+    (dump_expr, load_expr, parse('"ünïcødé" == 2.5 * -(1 + 2)')),
+])
+def test_rejects_every_truncation(dump, load, value):
+    data = dump(value)
+
+    for end in range(len(data)):
+        with pytest.raises(ValueError):
+            load(data[:end])
+
+
+def test_block_statements_are_rejected():
+    statements, _ = Parser(tokens=scan("{ 1; }")).parse_all()
+
+    with pytest.raises(TypeError, match="Block"):
+        dump_expr(statements[0])
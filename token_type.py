@@ -1,54 +1,100 @@
-from enum import Enum, auto
-
 """
-Defines all the valid TokenTypes for hill in an enum.
+Defines all the valid TokenTypes for hill.
+
+Token types are plain ints written out here rather than an `Enum`, so importing them costs next to nothing
+and comparing or hashing them is as cheap as it gets. The codes are also the token type codes of `wire_format`,
+so existing values must never change; new types get the next free code.
 """
-class TokenType(Enum):
-    # Single-character tokens 
-    LEFT_PAREN = auto()
-    RIGHT_PAREN = auto()
-    LEFT_BRACE = auto()
-    RIGHT_BRACE = auto()
-    COMMA = auto()
-    DOT = auto()
-    MINUS = auto()
-    PLUS = auto()
-    SEMICOLON = auto()
-    SLASH = auto()
-    STAR = auto()
+class TokenType:
+    # Single-character tokens
+    LEFT_PAREN = 1
+    RIGHT_PAREN = 2
+    LEFT_BRACE = 3
+    RIGHT_BRACE = 4
+    COMMA = 5
+    DOT = 6
+    MINUS = 7
+    PLUS = 8
+    SEMICOLON = 9
+    SLASH = 10
+    STAR = 11
 
     # One or two character tokens.
-    BANG = auto()
-    BANG_EQUAL = auto()
-    EQUAL = auto()
-    EQUAL_EQUAL = auto()
-    GREATER = auto()
-    GREATER_EQUAL = auto()
-    LESS = auto
-    LESS_EQUAL = auto()
+    BANG = 12
+    BANG_EQUAL = 13
+    EQUAL = 14
+    EQUAL_EQUAL = 15
+    GREATER = 16
+    GREATER_EQUAL = 17
+    LESS = 18
+    LESS_EQUAL = 19
 
     # Literals.
-    IDENTIFIER = auto()
-    STRING = auto()
-    NUMBER = auto()
+    IDENTIFIER = 20
+    STRING = 21
+    NUMBER = 22
 
     # Keywords.
-    AND = auto()
-    CLASS = auto()
-    ELSE = auto()
-    FALSE = auto()
-    FUN = auto()
-    FOR = auto()
-    IF = auto()
-    NIL = auto()
-    OR = auto()
-    PRINT = auto()
-    RETURN = auto()
-    SUPER = auto()
-    THIS = auto()
-    TRUE = auto()
-    VAR = auto()
-    WHILE = auto()
+    AND = 23
+    CLASS = 24
+    ELSE = 25
+    FALSE = 26
+    FUN = 27
+    FOR = 28
+    IF = 29
+    NIL = 30
+    OR = 31
+    PRINT = 32
+    RETURN = 33
+    SUPER = 34
+    THIS = 35
+    TRUE = 36
+    VAR = 37
+    WHILE = 38
 
     # End of File
-    EOF = auto()
\ No newline at end of file
+    EOF = 39
+
+# Name of each token type, indexed by its code
+TOKEN_TYPE_NAMES = (
+    None,
+    "LEFT_PAREN",
+    "RIGHT_PAREN",
+    "LEFT_BRACE",
+    "RIGHT_BRACE",
+    "COMMA",
+    "DOT",
+    "MINUS",
+    "PLUS",
+    "SEMICOLON",
+    "SLASH",
+    "STAR",
+    "BANG",
+    "BANG_EQUAL",
+    "EQUAL",
+    "EQUAL_EQUAL",
+    "GREATER",
+    "GREATER_EQUAL",
+    "LESS",
+    "LESS_EQUAL",
+    "IDENTIFIER",
+    "STRING",
+    "NUMBER",
+    "AND",
+    "CLASS",
+    "ELSE",
+    "FALSE",
+    "FUN",
+    "FOR",
+    "IF",
+    "NIL",
+    "OR",
+    "PRINT",
+    "RETURN",
+    "SUPER",
+    "THIS",
+    "TRUE",
+    "VAR",
+    "WHILE",
+    "EOF",
+)
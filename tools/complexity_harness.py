@@ -0,0 +1,199 @@
+import gc
+import sys
+import tracemalloc
+from argparse import ArgumentParser
+from contextlib import redirect_stderr
+from io import StringIO
+from math import log
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, List, Tuple
+
+# The interpreter modules live in the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scanner import Scanner
+from parser import Parser, LazyBlock, MAX_NESTING_DEPTH
+from ast_printer import AstPrinter
+from interpreter import Interpreter
+
+"""
+Worst-case complexity regression harness for the Scanner, Parser, AstPrinter and Interpreter.
+
+Every case generates a pathological input at doubling sizes and runs it through each phase.
+The time and peak memory of every phase are measured per size, and a least squares fit of
+log(cost) against log(size) gives the growth exponent: ~1 is linear, ~2 is quadratic.
+A phase fails when its exponent exceeds 1 + tolerance, or when it raises instead of returning
+(in particular RecursionError).
+Inputs nested past the parser's MAX_NESTING_DEPTH only measure how it reports them, so the
+"to the limit" cases repeat structures nested just under it to cover the parse itself.
+
+Usage: python tools/complexity_harness.py [--base-size N] [--steps K] [--repeats R] [--tolerance T]
+
+Timings of a few milliseconds jump by 2-3x between neighbouring sizes (allocator and cache effects),
+so the fit needs a wide range of sizes and the best of several runs. The defaults
+(--base-size 2000 --steps 5 --repeats 3) are the smallest settings that pass reliably. Smaller ones such as
+--base-size 1000 --steps 4, with 1 or even 3 repeats, report spurious exponents of 1.3-1.4 on linear phases.
+"""
+
+# Phases whose largest run stays below these are pure noise to fit, their growth is reported as 0
+MIN_FIT_TIME = 5e-3
+MIN_FIT_MEMORY = 64 * 1024
+
+# Deepest nesting the parser accepts, inputs nested deeper only exercise its error path
+DEEPEST = MAX_NESTING_DEPTH - 1
+
+# Pathological inputs, each a function of the size n
+CASES: Dict[str, Callable[[int], str]] = {
+    "nested comments": lambda n: "/*" * n + "*/" * n + " 1",
+    "unterminated comment": lambda n: "/*" * n,
+    "long string": lambda n: '"' + "x" * (10 * n) + '"',
+    "unterminated string": lambda n: '"' + "x\n" * (5 * n),
+    "unary minus chain": lambda n: "-" * n + "1",
+    "unary bang chain": lambda n: "!" * n + "nil",
+    "wide binary chain": lambda n: " + ".join(["1"] * n),
+    "wide string concatenation": lambda n: " + ".join(['"' + "x" * 20 + '"'] * n),
+    "nested groups": lambda n: "(" * n + "1" + ")" * n,
+    "nested blocks": lambda n: "{" * n + "}" * n,
+    "groups nested to the limit": lambda n: " + ".join(["(" * DEEPEST + "1" + ")" * DEEPEST] * (n // DEEPEST + 1)),
+    "blocks nested to the limit": lambda n: ("{" * DEEPEST + "1;" + "}" * DEEPEST) * (n // DEEPEST + 1),
+}
+
+
+def scan(source: str):
+    return Scanner(source=source).scan_tokens()
+
+
+def parse(tokens):
+    return Parser(tokens=tokens).parse()
+
+
+def parse_all(tokens):
+    return Parser(tokens=tokens).parse_all()
+
+
+def parse_lazy(tokens):
+    """Pre-parses, then reads every block body so that each `LazyBlock` is parsed as well."""
+    statements, diagnostics = Parser(tokens=tokens).parse_all(lazy_blocks=True)
+    blocks = [statement for statement in statements if isinstance(statement, LazyBlock)]
+
+    while blocks:
+        blocks.extend(statement for statement in blocks.pop().statements if isinstance(statement, LazyBlock))
+
+    return statements, diagnostics
+
+
+def print_ast(expr):
+    return AstPrinter(reverse_polish_notation=True).print(expr) if expr is not None else None
+
+
+def evaluate(expr):
+    """Evaluates and stringifies, so a string result built as a `Rope` is flattened as part of the phase."""
+    return Interpreter.stringify(Interpreter().evaluate(expr)) if expr is not None else None
+
+
+def measure(function: Callable, argument, repeats: int) -> Tuple[float, int]:
+    """Returns the best wall time out of `repeats` runs and the peak traced memory of one run."""
+    best = float("inf")
+    # Like timeit, collections are kept out of the timed runs, they land at sizes unrelated to the input
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start = perf_counter()
+            function(argument)
+            best = min(best, perf_counter() - start)
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    function(argument)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return best, peak
+
+
+def growth_exponent(sizes: List[int], costs: List[float]) -> float:
+    """Slope of the least squares line through (log size, log cost)."""
+    xs = [log(size) for size in sizes]
+    ys = [log(max(cost, 1e-9)) for cost in costs]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    variance = sum((x - mean_x) ** 2 for x in xs)
+
+    return covariance / variance
+
+
+def run_case(name: str, generate: Callable[[int], str], sizes: List[int], repeats: int, tolerance: float) -> bool:
+    # phase -> (times, peaks)
+    results: Dict[str, Tuple[List[float], List[int]]] = {}
+    passed = True
+
+    for size in sizes:
+        source = generate(size)
+
+        try:
+            with redirect_stderr(StringIO()):
+                tokens = scan(source)
+                expr = parse(tokens)
+
+                phases = (
+                    ("scan", scan, source),
+                    ("parse", parse, tokens),
+                    ("parse_all", parse_all, tokens),
+                    ("parse_lazy", parse_lazy, tokens),
+                    ("print", print_ast, expr),
+                    ("evaluate", evaluate, expr),
+                )
+
+                for phase, function, argument in phases:
+                    times, peaks = results.setdefault(phase, ([], []))
+                    time, peak = measure(function, argument, repeats)
+                    times.append(time)
+                    peaks.append(peak)
+        except Exception as error:
+            print(f"FAIL  {name}: {type(error).__name__} at size {size}: {error}")
+            return False
+
+    for phase, (times, peaks) in results.items():
+        time_exponent = growth_exponent(sizes, times) if max(times) >= MIN_FIT_TIME else 0.0
+        memory_exponent = growth_exponent(sizes, peaks) if max(peaks) >= MIN_FIT_MEMORY else 0.0
+
+        ok = time_exponent <= 1 + tolerance and memory_exponent <= 1 + tolerance
+        passed = passed and ok
+
+        print(
+            f"{'ok  ' if ok else 'FAIL'}  {name:<26} {phase:<10} "
+            f"time ~n^{time_exponent:.2f} ({times[-1] * 1000:8.2f} ms)  "
+            f"memory ~n^{memory_exponent:.2f} ({peaks[-1] / 1024:8.0f} KiB)"
+        )
+
+    return passed
+
+
+def main():
+    arg_parser = ArgumentParser(description="Fails if any phase grows worse than linearly on pathological input.")
+    arg_parser.add_argument("--base-size", type=int, default=2000, help="size of the smallest input")
+    arg_parser.add_argument("--steps", type=int, default=5, help="number of doublings of the input size")
+    arg_parser.add_argument("--repeats", type=int, default=3, help="timed runs per size, the best is kept")
+    arg_parser.add_argument("--tolerance", type=float, default=0.3, help="allowed exponent above 1")
+    args = arg_parser.parse_args()
+
+    sizes = [args.base_size * 2 ** step for step in range(args.steps)]
+    passed = True
+
+    for name, generate in CASES.items():
+        passed = run_case(name, generate, sizes, args.repeats, args.tolerance) and passed
+
+    if not passed:
+        print("Complexity regression detected.")
+        exit(1)
+
+    print("All phases scale linearly.")
+
+
+if __name__ == '__main__':
+    main()
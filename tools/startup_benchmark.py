@@ -0,0 +1,84 @@
+import subprocess
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+from time import perf_counter
+
+"""
+Cold start benchmark for hill.py.
+
+Measures, each as the best of several fresh interpreter processes:
+  import:        time spent in `import hill`, i.e. importing the interpreter and everything it needs
+  first output:  wall time from spawning `python hill.py <script>` until its first line of output,
+                 minus the same measurement for a bare `python -c "print()"`, so that only the
+                 cost Hill adds on top of Python's own startup is compared against the budget
+
+Exits with status 1 when either number is over its budget.
+
+Usage: python tools/startup_benchmark.py [--script PATH] [--runs N]
+"""
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Budgets in milliseconds, on top of the bare Python interpreter
+IMPORT_BUDGET_MS = 20.0
+FIRST_OUTPUT_BUDGET_MS = 30.0
+
+IMPORT_TIMER = "from time import perf_counter; start = perf_counter(); import hill; print(perf_counter() - start)"
+
+
+def import_time(runs: int) -> float:
+    best = float("inf")
+
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_TIMER],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        best = min(best, float(output))
+
+    return best * 1000
+
+
+def first_output_time(command, runs: int) -> float:
+    best = float("inf")
+
+    for _ in range(runs):
+        start = perf_counter()
+        process = subprocess.Popen(command, cwd=REPO_ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        process.stdout.readline()
+        elapsed = perf_counter() - start
+
+        process.communicate()
+        best = min(best, elapsed)
+
+    return best * 1000
+
+
+def main():
+    arg_parser = ArgumentParser(description="Checks hill.py startup time against its budget.")
+    arg_parser.add_argument("--script", default=str(REPO_ROOT / "hill_scripts" / "hello.hill"))
+    arg_parser.add_argument("--runs", type=int, default=20, help="fresh processes per measurement, the best is kept")
+    args = arg_parser.parse_args()
+
+    # Warm up, so that bytecode caches are written before anything is timed
+    subprocess.run([sys.executable, "hill.py", args.script], cwd=REPO_ROOT, capture_output=True)
+
+    imports = import_time(args.runs)
+    bare = first_output_time([sys.executable, "-c", "print()"], args.runs)
+    hill = first_output_time([sys.executable, "hill.py", args.script], args.runs)
+    first_output = hill - bare
+
+    print(f"import hill:   {imports:6.1f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)")
+    print(f"first output:  {hill:6.1f} ms, {first_output:.1f} ms over bare python {bare:.1f} ms "
+          f"(budget {FIRST_OUTPUT_BUDGET_MS:.0f} ms)")
+
+    if imports > IMPORT_BUDGET_MS or first_output > FIRST_OUTPUT_BUDGET_MS:
+        print("Startup is over budget.")
+        exit(1)
+
+    print("Startup is within budget.")
+
+
+if __name__ == '__main__':
+    main()
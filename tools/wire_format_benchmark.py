@@ -0,0 +1,54 @@
+import pickle
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+from timeit import timeit
+
+# The interpreter modules live in the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scanner import Scanner
+from parser import Parser
+from wire_format import dump_tokens, load_tokens, dump_expr, load_expr
+
+"""
+Size and speed comparison of wire_format.py against pickle on a synthetic script.
+Correctness of the format is covered by tests/test_wire_format.py, this only reports numbers.
+
+Usage: python tools/wire_format_benchmark.py [--lines N] [--runs N]
+"""
+
+
+def compare(name: str, value, dump, load, runs: int):
+    wire_data = dump(value)
+    pickle_data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def per_run(function) -> float:
+        return timeit(function, number=runs) / runs * 1000
+
+    print(f"{name}: wire {len(wire_data)} bytes, pickle {len(pickle_data)} bytes")
+    print(f"  dump: wire {per_run(lambda: dump(value)):.1f} ms, "
+          f"pickle {per_run(lambda: pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)):.1f} ms")
+    print(f"  load: wire {per_run(lambda: load(wire_data)):.1f} ms, "
+          f"pickle {per_run(lambda: pickle.loads(pickle_data)):.1f} ms")
+
+
+def main():
+    arg_parser = ArgumentParser(description="Compares the Hill wire format against pickle.")
+    arg_parser.add_argument("--lines", type=int, default=2000, help="lines of the synthetic token source")
+    arg_parser.add_argument("--runs", type=int, default=5, help="timed runs per measurement, the mean is kept")
+    args = arg_parser.parse_args()
+
+    source = 'var total = price * (1 + rate) - "discount" == !false, nil;\n' * args.lines
+    tokens = Scanner(source=source).scan_tokens()
+
+    # Kept shallow enough for pickle, which recurses once per level of the tree
+    formula = ' + '.join(['(12.5 * (1 + 0.2) - 3 == !false)', '-"total" / 7'] * 100)
+    expression = Parser(tokens=Scanner(source=formula).scan_tokens()).parse()
+
+    compare("tokens", tokens, dump_tokens, load_tokens, args.runs)
+    compare("expression", expression, dump_expr, load_expr, args.runs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,467 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from io import BufferedIOBase
+from math import copysign
+from struct import Struct, error as StructError
+
+from hill_token import Token
+from token_type import TOKEN_TYPE_NAMES
+from line_index import LineIndex
+from expr import Expr, BinaryExpr, UnaryExpr, GroupExpr, LiteralExpr
+
+"""
+Versioned binary format for `Scanner` token lists and `expr.py` trees.
+
+document       → header item* END ;
+header         → MAGIC version kind line_starts ;
+line_starts    → count ( delta )* ;                      line starts of the source, delta encoded
+token          → type_code lexeme literal position ;
+expression     → NONE | BINARY token expression expression
+               | UNARY token expression | GROUP expression | LITERAL literal ;
+
+Only `expr.py` trees can be encoded. The `Block` statements returned by `Parser.parse_all` have no node tag,
+so `write_expr` rejects them with a TypeError; encode the expressions inside a block one by one instead.
+
+Every integer is an unsigned LEB128 varint, signed ones are zigzag encoded first.
+Items of a TOKENS document are tokens, items of an EXPRESSIONS document are pre-order encoded trees.
+
+type_code:
+  The `TokenType` code itself, token types start from 1 so 0 is free for END.
+
+lexeme / string literals:
+  Strings go through a table that both sides build as the stream is read.
+  A reference of 0 is followed by the length and UTF-8 bytes of a new table entry,
+  any other reference n is entry n - 1. Repeated lexemes such as `+` or identifiers are stored once.
+
+position:
+  Zigzag delta of the token offset from the previous token offset, shifted left by 1.
+  Tokens that only carry a line (no offset) set the low bit and store the line instead.
+"""
+
+MAGIC = b'HILW'
+FORMAT_VERSION = 1
+
+KIND_TOKENS = 1
+KIND_EXPRESSIONS = 2
+
+END = 0
+
+# Expression node tags
+NODE_NONE = 1
+NODE_BINARY = 2
+NODE_UNARY = 3
+NODE_GROUP = 4
+NODE_LITERAL = 5
+
+# Literal tags
+LITERAL_NIL = 0
+LITERAL_TRUE = 1
+LITERAL_FALSE = 2
+LITERAL_INTEGRAL = 3
+LITERAL_FLOAT = 4
+LITERAL_STRING = 5
+
+DOUBLE = Struct('<d')
+MAX_EXACT_INTEGRAL = 2 ** 53
+
+# Reading past the end of the buffer raises one of these, they are reported as a corrupt document
+READ_ERRORS = (IndexError, StructError)
+CORRUPT_DOCUMENT = "Truncated or corrupt Hill wire format document"
+
+# Encoded bytes are handed to the output stream in chunks of roughly this size
+FLUSH_THRESHOLD = 64 * 1024
+
+
+def zigzag(n: int) -> int:
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+
+def unzigzag(n: int) -> int:
+    return n >> 1 if not n & 1 else -(n >> 1) - 1
+
+
+class WireEncoder:
+    """
+    Streaming encoder, items are written to `stream` as they are added.
+    `close()` must be called to terminate the document; it does not close `stream`.
+    Token positions are written as offsets into `line_index`. Tokens from any other source (or
+    when there is no `line_index`) are written with their line instead, so lines always survive.
+    """
+    def __init__(self, stream: BufferedIOBase, kind: int, line_index: LineIndex | None = None):
+        if kind not in (KIND_TOKENS, KIND_EXPRESSIONS):
+            raise ValueError(f"Unknown document kind: {kind}")
+
+        self.stream = stream
+        self.kind = kind
+        self.buffer = bytearray()
+        self.strings = {}
+        self.prev_offset = 0
+        self.line_index = line_index
+
+        self.buffer += MAGIC
+        self.write_varint(FORMAT_VERSION)
+        self.write_varint(kind)
+
+        line_starts = line_index.line_starts if line_index is not None else []
+        self.write_varint(len(line_starts))
+        prev_start = 0
+        for start in line_starts:
+            self.write_varint(start - prev_start)
+            prev_start = start
+
+    def write_varint(self, n: int):
+        buffer = self.buffer
+        while n > 0x7F:
+            buffer.append((n & 0x7F) | 0x80)
+            n >>= 7
+        buffer.append(n)
+
+    def write_string(self, string: str):
+        ref = self.strings.get(string)
+
+        if ref is not None:
+            self.write_varint(ref)
+            return
+
+        self.strings[string] = len(self.strings) + 1
+        encoded = string.encode('utf-8')
+        self.write_varint(0)
+        self.write_varint(len(encoded))
+        self.buffer += encoded
+
+    def write_literal(self, literal):
+        buffer = self.buffer
+
+        if literal is None:
+            buffer.append(LITERAL_NIL)
+        elif literal is True:
+            buffer.append(LITERAL_TRUE)
+        elif literal is False:
+            buffer.append(LITERAL_FALSE)
+        elif isinstance(literal, float):
+            # Whole numbers are stored as varints; -0.0, infinities and NaN keep the exact 8-byte form
+            if (
+                literal.is_integer() and abs(literal) < MAX_EXACT_INTEGRAL
+                and (literal != 0 or copysign(1.0, literal) > 0)
+            ):
+                buffer.append(LITERAL_INTEGRAL)
+                self.write_varint(zigzag(int(literal)))
+            else:
+                buffer.append(LITERAL_FLOAT)
+                buffer += DOUBLE.pack(literal)
+        elif isinstance(literal, str):
+            buffer.append(LITERAL_STRING)
+            self.write_string(literal)
+        else:
+            raise TypeError(f"Cannot encode literal of type {type(literal).__name__}")
+
+    def write_token(self, token: Token):
+        """Appends a token, or for EXPRESSIONS documents the operator of a node."""
+        self.write_varint(token.token_type)
+        self.write_string(token.lexeme)
+        self.write_literal(token.literal)
+
+        if token.offset is not None and token.line_index is self.line_index is not None:
+            self.write_varint(zigzag(token.offset - self.prev_offset) << 1)
+            self.prev_offset = token.offset
+        else:
+            # Lines start from 1, so 0 stands in for a token without any position
+            self.write_varint((token.line or 0) << 1 | 1)
+
+        if len(self.buffer) >= FLUSH_THRESHOLD:
+            self.flush()
+
+    def write_expr(self, expr: Expr | None):
+        """Appends one tree in pre-order. Iterative, so deep trees cannot exhaust the Python stack."""
+        stack = [expr]
+
+        while stack:
+            node = stack.pop()
+
+            if node is None:
+                self.buffer.append(NODE_NONE)
+            elif isinstance(node, BinaryExpr):
+                self.buffer.append(NODE_BINARY)
+                self.write_token(node.operator)
+                stack.append(node.expr_right)
+                stack.append(node.expr_left)
+            elif isinstance(node, UnaryExpr):
+                self.buffer.append(NODE_UNARY)
+                self.write_token(node.operator)
+                stack.append(node.expr_right)
+            elif isinstance(node, GroupExpr):
+                self.buffer.append(NODE_GROUP)
+                stack.append(node.expr)
+            elif isinstance(node, LiteralExpr):
+                self.buffer.append(NODE_LITERAL)
+                self.write_literal(node.value)
+            else:
+                raise TypeError(f"Cannot encode node of type {type(node).__name__}")
+
+        if len(self.buffer) >= FLUSH_THRESHOLD:
+            self.flush()
+
+    def flush(self):
+        self.stream.write(self.buffer)
+        self.buffer = bytearray()
+
+    def close(self):
+        self.buffer.append(END)
+        self.flush()
+
+
+class _Root:
+    """Slot the decoder assigns the root of a tree to."""
+    expr = None
+
+
+class WireDecoder:
+    """
+    Streaming decoder over `bytes`, `bytearray`, `memoryview` or `mmap`.
+    The buffer is read through a memoryview, so no part of it is copied except the decoded strings themselves.
+    Call `release()` (or use `with`) before closing an mmap the decoder was given.
+    """
+    def __init__(self, buffer):
+        self.view = memoryview(buffer).cast('B')
+        self.pos = 0
+        self.strings: list[str] = []
+        self.prev_offset = 0
+
+        if self.view[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a Hill wire format document")
+        self.pos = len(MAGIC)
+
+        try:
+            version = self.read_varint()
+            if version != FORMAT_VERSION:
+                raise ValueError(f"Unsupported wire format version: {version}")
+
+            self.kind = self.read_varint()
+            if self.kind not in (KIND_TOKENS, KIND_EXPRESSIONS):
+                raise ValueError(f"Unknown document kind: {self.kind}")
+
+            line_starts = []
+            start = 0
+            for _ in range(self.read_varint()):
+                start += self.read_varint()
+                line_starts.append(start)
+        except READ_ERRORS as error:
+            raise ValueError(CORRUPT_DOCUMENT) from error
+
+        self.line_index = LineIndex.from_line_starts(line_starts) if line_starts else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def release(self):
+        self.view.release()
+
+    def read_byte(self) -> int:
+        byte = self.view[self.pos]
+        self.pos += 1
+
+        return byte
+
+    def read_varint(self) -> int:
+        view = self.view
+        pos = self.pos
+
+        # Most type codes, string references and offset deltas fit in one byte
+        byte = view[pos]
+        if byte < 0x80:
+            self.pos = pos + 1
+            return byte
+
+        result = 0
+        shift = 0
+
+        while True:
+            byte = view[pos]
+            pos += 1
+            result |= (byte & 0x7F) << shift
+
+            if byte < 0x80:
+                self.pos = pos
+                return result
+
+            shift += 7
+
+    def read_string(self) -> str:
+        ref = self.read_varint()
+
+        if ref:
+            return self.strings[ref - 1]
+
+        length = self.read_varint()
+        if self.pos + length > len(self.view):
+            raise ValueError(CORRUPT_DOCUMENT)
+
+        string = str(self.view[self.pos: self.pos + length], 'utf-8')
+        self.pos += length
+        self.strings.append(string)
+
+        return string
+
+    def read_literal(self):
+        tag = self.read_byte()
+
+        if tag == LITERAL_NIL:
+            return None
+        elif tag == LITERAL_TRUE:
+            return True
+        elif tag == LITERAL_FALSE:
+            return False
+        elif tag == LITERAL_INTEGRAL:
+            return float(unzigzag(self.read_varint()))
+        elif tag == LITERAL_FLOAT:
+            literal = DOUBLE.unpack_from(self.view, self.pos)[0]
+            self.pos += DOUBLE.size
+            return literal
+        elif tag == LITERAL_STRING:
+            return self.read_string()
+
+        raise ValueError(f"Unknown literal tag: {tag}")
+
+    def read_token(self, token_type: int) -> Token:
+        if not 0 < token_type < len(TOKEN_TYPE_NAMES):
+            raise ValueError(f"Unknown token type: {token_type}")
+
+        lexeme = self.read_string()
+        literal = self.read_literal()
+        position = self.read_varint()
+
+        if position & 1:
+            return Token(token_type, lexeme, literal, line=(position >> 1) or None)
+
+        self.prev_offset += unzigzag(position >> 1)
+
+        return Token(token_type, lexeme, literal, offset=self.prev_offset, line_index=self.line_index)
+
+    def tokens(self) -> Iterator[Token]:
+        """Yields the tokens of a TOKENS document one at a time."""
+        if self.kind != KIND_TOKENS:
+            raise ValueError("Document does not contain tokens")
+
+        try:
+            type_code = self.read_varint()
+            while type_code != END:
+                yield self.read_token(type_code)
+                type_code = self.read_varint()
+        except READ_ERRORS as error:
+            raise ValueError(CORRUPT_DOCUMENT) from error
+
+    def expressions(self) -> Iterator[Expr | None]:
+        """Yields the trees of an EXPRESSIONS document one at a time."""
+        if self.kind != KIND_EXPRESSIONS:
+            raise ValueError("Document does not contain expressions")
+
+        try:
+            while self.view[self.pos] != END:
+                root = _Root()
+                # (node, attribute) slots waiting for a child, filled in pre-order
+                slots = [(root, 'expr')]
+
+                while slots:
+                    parent, attribute = slots.pop()
+                    tag = self.read_byte()
+
+                    if tag == NODE_NONE:
+                        node = None
+                    elif tag == NODE_BINARY:
+                        node = BinaryExpr(None, self.read_token(self.read_varint()), None)
+                        slots.append((node, 'expr_right'))
+                        slots.append((node, 'expr_left'))
+                    elif tag == NODE_UNARY:
+                        node = UnaryExpr(self.read_token(self.read_varint()), None)
+                        slots.append((node, 'expr_right'))
+                    elif tag == NODE_GROUP:
+                        node = GroupExpr(None)
+                        slots.append((node, 'expr'))
+                    elif tag == NODE_LITERAL:
+                        node = LiteralExpr(self.read_literal())
+                    else:
+                        raise ValueError(f"Unknown node tag: {tag}")
+
+                    setattr(parent, attribute, node)
+
+                yield root.expr
+
+            self.pos += 1
+        except READ_ERRORS as error:
+            raise ValueError(CORRUPT_DOCUMENT) from error
+
+
+class _BytesSink:
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+
+
+def dump_tokens(tokens: list[Token]) -> bytes:
+    sink = _BytesSink()
+    line_index = tokens[0].line_index if tokens else None
+    encoder = WireEncoder(sink, KIND_TOKENS, line_index=line_index)
+
+    for token in tokens:
+        encoder.write_token(token)
+    encoder.close()
+
+    return b''.join(sink.chunks)
+
+
+def load_tokens(buffer) -> list[Token]:
+    with WireDecoder(buffer) as decoder:
+        return list(decoder.tokens())
+
+
+def find_line_index(expr: Expr | None) -> LineIndex | None:
+    """Returns the line index of the first operator token in `expr` that has one."""
+    stack = [expr]
+
+    while stack:
+        node = stack.pop()
+
+        if isinstance(node, BinaryExpr):
+            stack.append(node.expr_right)
+            stack.append(node.expr_left)
+        elif isinstance(node, UnaryExpr):
+            stack.append(node.expr_right)
+        elif isinstance(node, GroupExpr):
+            stack.append(node.expr)
+
+        operator = getattr(node, 'operator', None)
+        if operator is not None and operator.line_index is not None:
+            return operator.line_index
+
+    return None
+
+
+def dump_expr(expr: Expr | None, line_index: LineIndex | None = None) -> bytes:
+    """`line_index` defaults to the one the operator tokens of `expr` were scanned with."""
+    if line_index is None:
+        line_index = find_line_index(expr)
+
+    sink = _BytesSink()
+    encoder = WireEncoder(sink, KIND_EXPRESSIONS, line_index=line_index)
+    encoder.write_expr(expr)
+    encoder.close()
+
+    return b''.join(sink.chunks)
+
+
+def load_expr(buffer) -> Expr | None:
+    with WireDecoder(buffer) as decoder:
+        # Read up to END as well, so a document cut right after its tree is still rejected
+        trees = list(decoder.expressions())
+
+    if len(trees) != 1:
+        raise ValueError(f"Expected one expression, found {len(trees)}")
+
+    return trees[0]
+